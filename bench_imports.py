@@ -0,0 +1,66 @@
+"""Benchmark do tempo de importação do núcleo da simulação.
+
+Os módulos do núcleo (modelo, grid em blocos, métricas, série temporal e
+catálogo) devem depender só de NumPy e da biblioteca padrão, pois são
+importados em cada processo trabalhador. Este script importa cada um em um
+interpretador novo e falha (código de saída 1) se algum carregar
+matplotlib, pandas ou fontTools, ou se passar do orçamento de tempo.
+
+Uso: python bench_imports.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+CORE_MODULES = ('models', 'blockgrid', 'metrics', 'timeseries', 'catalog')
+FORBIDDEN_MODULES = ('matplotlib', 'pandas', 'fontTools')
+MAX_IMPORT_SECONDS = 0.5  # Orçamento por módulo (inclui o NumPy)
+REPEATS = 5
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def measure(module):
+    """Importa `module` em um interpretador novo; retorna (segundos, módulos)."""
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(module=module)],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return data['elapsed'], data['modules']
+
+
+def main():
+    failed = False
+    for module in CORE_MODULES:
+        timings = []
+        for _ in range(REPEATS):
+            elapsed, loaded = measure(module)
+            timings.append(elapsed)
+
+        best = min(timings)
+        heavy = sorted({name.split('.')[0] for name in loaded
+                        if name.split('.')[0] in FORBIDDEN_MODULES})
+        status = 'ok'
+        if heavy:
+            status = f"FALHOU: carrega {', '.join(heavy)}"
+            failed = True
+        elif best > MAX_IMPORT_SECONDS:
+            status = f"FALHOU: acima de {MAX_IMPORT_SECONDS:.2f}s"
+            failed = True
+
+        print(f"{module:<12} {best * 1000:8.1f} ms  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
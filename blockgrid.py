@@ -0,0 +1,104 @@
+"""Array 2D multirresolução, guardado em blocos.
+
+Blocos uniformes (todas as células com o mesmo valor) são guardados como um
+único valor em `uniform`; apenas os blocos refinados têm um array completo
+em `blocks`. Assim a memória cresce com a área ativa do grid, e não com o
+tamanho total do domínio.
+"""
+import numpy as np
+
+
+class BlockArray:
+    """Array 2D de blocos `block_size` x `block_size`, uniformes ou refinados."""
+
+    def __init__(self, height, width, block_size, fill=0, dtype=int):
+        self.height, self.width = height, width
+        self.block_size = block_size
+        self.block_shape = (-(-height // block_size), -(-width // block_size))
+        self.dtype = dtype
+        self.uniform = np.full(self.block_shape, fill, dtype=dtype)
+        self.blocks = {}  # (by, bx) -> array do bloco refinado
+
+    def bounds(self, key):
+        """Retorna (y0, y1, x0, x1) das células do bloco `key`."""
+        by, bx = key
+        y0, x0 = by * self.block_size, bx * self.block_size
+        return y0, min(y0 + self.block_size, self.height), x0, min(x0 + self.block_size, self.width)
+
+    def __getitem__(self, index):
+        y, x = index
+        size = self.block_size
+        block = self.blocks.get((y // size, x // size))
+        if block is None:
+            return self.uniform[y // size, x // size]
+        return block[y % size, x % size]
+
+    def __setitem__(self, index, value):
+        y, x = index
+        size = self.block_size
+        key = (y // size, x // size)
+        block = self.blocks.get(key)
+        if block is None:
+            block = self.refine(key)
+        block[y % size, x % size] = value
+
+    def is_refined(self, key):
+        return key in self.blocks
+
+    def refine(self, key):
+        """Expande um bloco uniforme para resolução completa."""
+        block = self.blocks.get(key)
+        if block is None:
+            y0, y1, x0, x1 = self.bounds(key)
+            block = np.full((y1 - y0, x1 - x0), self.uniform[key], dtype=self.dtype)
+            self.blocks[key] = block
+        return block
+
+    def coarsen(self, key, value):
+        """Substitui um bloco pelo valor único `value`."""
+        self.blocks.pop(key, None)
+        self.uniform[key] = value
+
+    def copy(self, keys):
+        """Cópia que duplica só os blocos em `keys` e compartilha os demais.
+
+        Os blocos não copiados não devem ser escritos na cópia.
+        """
+        clone = BlockArray.__new__(BlockArray)
+        clone.__dict__.update(self.__dict__)
+        clone.uniform = self.uniform.copy()
+        clone.blocks = dict(self.blocks)
+        for key in keys:
+            clone.blocks[key] = self.blocks[key].copy()
+        return clone
+
+    def to_dense(self):
+        """Materializa o array completo (para visualização e gravação)."""
+        size = self.block_size
+        dense = np.repeat(np.repeat(self.uniform, size, axis=0), size, axis=1)
+        dense = dense[:self.height, :self.width]
+        for key, block in self.blocks.items():
+            y0, y1, x0, x1 = self.bounds(key)
+            dense[y0:y1, x0:x1] = block
+        return dense
+
+    def sample(self, stride):
+        """Equivale a `to_dense()[::stride, ::stride]`, sem materializar o array.
+
+        O custo depende só do tamanho da saída e dos blocos refinados.
+        """
+        size = self.block_size
+        ys, xs = np.arange(0, self.height, stride), np.arange(0, self.width, stride)
+        sampled = self.uniform[np.ix_(ys // size, xs // size)]
+        for key, block in self.blocks.items():
+            y0, y1, x0, x1 = self.bounds(key)
+            # Índices das amostras que caem no bloco
+            i0, i1 = -(-y0 // stride), -(-y1 // stride)
+            j0, j1 = -(-x0 // stride), -(-x1 // stride)
+            if i0 < i1 and j0 < j1:
+                sampled[i0:i1, j0:j1] = block[i0 * stride - y0::stride, j0 * stride - x0::stride]
+        return sampled
+
+    @property
+    def nbytes(self):
+        return self.uniform.nbytes + sum(block.nbytes for block in self.blocks.values())
@@ -0,0 +1,185 @@
+"""Catálogo SQLite das execuções salvas.
+
+Cada execução registra parâmetros, semente, motivo de parada, estatísticas
+resumidas e os caminhos dos artefatos (série colunar, CSV e imagem). As
+consultas rodam só sobre esse índice; as séries temporais são carregadas
+sob demanda, apenas para as execuções selecionadas.
+"""
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+
+from config import CATALOG_PATH, GRID_WIDTH, GRID_HEIGHT
+from timeseries import TimeSeries
+
+# Colunas da tabela `runs` (além de `id`), na ordem de criação
+RUN_COLUMNS = {
+    'created_at': 'TEXT',
+    'seed': 'INTEGER',
+    'r': 'REAL',
+    'gamma': 'REAL',
+    'c0': 'REAL',
+    'treatment_factor': 'REAL',
+    'grid_width': 'INTEGER',
+    'grid_height': 'INTEGER',
+    'steps': 'INTEGER',
+    'convergence_reason': 'TEXT',
+    'tumor_eliminated': 'INTEGER',
+    'final_tumor': 'REAL',
+    'final_necrotic': 'REAL',
+    'peak_tumor': 'REAL',
+    'final_radius': 'REAL',
+    'final_necrotic_fraction': 'REAL',
+    'series_path': 'TEXT',
+    'csv_path': 'TEXT',
+    'image_path': 'TEXT',
+}
+
+# Colunas mais usadas em filtros
+INDEXED_COLUMNS = ('r', 'gamma', 'c0', 'treatment_factor',
+                   'convergence_reason', 'tumor_eliminated')
+
+# Sufixos aceitos em `find`, no estilo coluna__operador=valor
+_OPERATORS = {'eq': '=', 'ne': '!=', 'gt': '>', 'ge': '>=', 'lt': '<', 'le': '<='}
+
+
+class RunCatalog:
+    """Índice local (SQLite) das execuções da simulação."""
+
+    def __init__(self, path=CATALOG_PATH):
+        self.path = path
+        self.base_dir = os.path.dirname(os.path.abspath(path))
+        os.makedirs(self.base_dir, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _create_schema(self):
+        columns = ', '.join(f'{name} {kind}' for name, kind in RUN_COLUMNS.items())
+        with self.connection:
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT, {columns})')
+            for name in INDEXED_COLUMNS:
+                self.connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS idx_runs_{name} ON runs ({name})')
+
+    def _relative(self, path):
+        """Guarda caminhos relativos ao catálogo, para poder movê-lo junto."""
+        return os.path.relpath(os.path.abspath(path), self.base_dir) if path else None
+
+    def add_run(self, simulation, series_path=None, csv_path=None, image_path=None):
+        """Registra uma execução e devolve seu id."""
+        series = simulation.series
+        tumor = series.column('tumor')
+        record = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'seed': simulation.seed,
+            'r': simulation.r,
+            'gamma': simulation.gamma,
+            'c0': simulation.c0,
+            'treatment_factor': simulation.treatment_factor,
+            'grid_width': GRID_WIDTH,
+            'grid_height': GRID_HEIGHT,
+            'steps': len(series),
+            'convergence_reason': simulation.convergence_reason,
+            'tumor_eliminated': int(len(series) > 0 and series.last('tumor') <= 0),
+            'final_tumor': series.last('tumor'),
+            'final_necrotic': series.last('necrotic'),
+            'peak_tumor': float(tumor.max()) if len(tumor) else None,
+            'final_radius': series.last('radius'),
+            'final_necrotic_fraction': series.last('necrotic_fraction'),
+            'series_path': self._relative(series_path),
+            'csv_path': self._relative(csv_path),
+            'image_path': self._relative(image_path),
+        }
+        # SQLite não aceita escalares NumPy
+        record = {name: value.item() if isinstance(value, np.generic) else value
+                  for name, value in record.items()}
+
+        names = ', '.join(record)
+        placeholders = ', '.join('?' for _ in record)
+        with self.connection:
+            cursor = self.connection.execute(
+                f'INSERT INTO runs ({names}) VALUES ({placeholders})', tuple(record.values()))
+        return cursor.lastrowid
+
+    def set_artifacts(self, run_id, series_path=None, csv_path=None, image_path=None):
+        """Grava os caminhos dos artefatos de uma execução já registrada."""
+        with self.connection:
+            self.connection.execute(
+                'UPDATE runs SET series_path = ?, csv_path = ?, image_path = ? WHERE id = ?',
+                (self._relative(series_path), self._relative(csv_path),
+                 self._relative(image_path), run_id))
+
+    def delete_run(self, run_id):
+        """Remove uma execução do catálogo (os arquivos não são apagados)."""
+        with self.connection:
+            self.connection.execute('DELETE FROM runs WHERE id = ?', (run_id,))
+
+    def find(self, order_by='id', limit=None, **filters):
+        """Busca execuções por filtros no estilo coluna__operador=valor.
+
+        Exemplo: find(gamma__gt=0.2, treatment_factor=1, tumor_eliminated=True)
+        """
+        clauses, params = [], []
+        for key, value in filters.items():
+            name, _, op = key.partition('__')
+            op = op or 'eq'
+            if name not in RUN_COLUMNS and name != 'id':
+                raise KeyError(f"Coluna desconhecida: {name}")
+            if op not in _OPERATORS:
+                raise ValueError(f"Operador desconhecido: {op}")
+            if value is None and op in ('eq', 'ne'):
+                clauses.append(f"{name} IS {'NOT ' if op == 'ne' else ''}NULL")
+                continue
+            clauses.append(f'{name} {_OPERATORS[op]} ?')
+            params.append(int(value) if isinstance(value, bool) else value)
+
+        if order_by.lstrip('-') not in RUN_COLUMNS and order_by.lstrip('-') != 'id':
+            raise KeyError(f"Coluna desconhecida: {order_by}")
+        direction = 'DESC' if order_by.startswith('-') else 'ASC'
+
+        query = 'SELECT * FROM runs'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        query += f" ORDER BY {order_by.lstrip('-')} {direction}"
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(int(limit))
+
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    def get(self, run_id):
+        """Retorna o registro de uma execução, ou None."""
+        runs = self.find(id=run_id)
+        return runs[0] if runs else None
+
+    def artifact_path(self, run, artifact='series_path'):
+        """Caminho absoluto de um artefato de uma execução."""
+        path = run[artifact]
+        return os.path.join(self.base_dir, path) if path else None
+
+    def load_series(self, run):
+        """Carrega a série temporal de uma execução (registro ou id)."""
+        if not isinstance(run, dict):
+            run = self.get(run)
+        path = self.artifact_path(run) if run else None
+        if path is None:
+            return None
+        return TimeSeries.load(path)
+
+    def iter_series(self, runs):
+        """Gera (registro, série) carregando uma série por vez."""
+        for run in runs:
+            yield run, self.load_series(run)
@@ -8,6 +8,7 @@ HEALTHY, TUMOR, NECROTIC = 0,1,2
 GRID_WIDTH = 100
 GRID_HEIGHT = 100
 INITIAL_RADIUS = 5
+BLOCK_SIZE = 10  # Lado dos blocos do grid multirresolução
 
 
 # Parâmetros biológicos
@@ -26,7 +27,31 @@ SPONTANEOUS_RATE = 0.001
 
 # Parâmetros da simulação
 ANIMATION_INTERVAL = 100
+MAX_PLOT_POINTS = 500  # Pontos por curva no gráfico de população
+
+# Persistência dos resultados (uma pasta por execução + catálogo SQLite)
+RESULTS_DIR = 'results'
+CATALOG_PATH = 'results/catalog.sqlite'
+
+# Servidor local de simulações (server.py)
+SERVER_HOST = '127.0.0.1'   # Apenas localhost
+SERVER_PORT = 8765
+SERVER_WORKERS = 2          # Processos simulando em paralelo
+SERVER_QUEUE_SIZE = 16      # Jobs aguardando; além disso, responde 503
+SERVER_MAX_FINISHED = 100   # Jobs terminados mantidos para consulta
+STREAM_FRAME_SIZE = 50      # Lado máximo dos frames enviados aos clientes
+STREAM_FRAME_EVERY = 10     # Passos entre frames, se o job não definir
+STREAM_STATS_BUFFER = 256   # Estatísticas pendentes por cliente lento
 
 # Parâmetros visuais
 FIGURE_SIZE = (14, 8)
-COLORS = ['white', 'red', 'black']  # Healthy, Tumor, Necrotic
\ No newline at end of file
+COLORS = ['white', 'red', 'black']  # Healthy, Tumor, Necrotic
+
+# Métricas morfológicas (ver metrics.MorphologyMetrics)
+METRIC_COLUMNS = ('radius', 'perimeter', 'gyration_radius',
+                  'necrotic_fraction', 'roughness', 'fractal_dimension')
+METRIC_BOX_SIZES = (2, 4, 8, 16, 32)  # Caixas para a dimensão fractal da borda
+METRICS_SELF_CHECK = False  # Confere as métricas com a varredura completa a cada passo (lento)
+
+# Colunas da série temporal (ver timeseries.TimeSeries)
+SERIES_COLUMNS = ('step', 'tumor', 'necrotic', 'growth_rate') + METRIC_COLUMNS
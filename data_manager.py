@@ -1,60 +1,136 @@
-"""Gerenciamento de dados e persistência."""
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.colors import ListedColormap
-from config import COLORS
+"""Gerenciamento de dados e persistência.
+
+pandas e matplotlib são importados só quando usados, para que processos
+que apenas rodam a simulação não paguem o custo dessas importações.
+"""
+import os
+
+from config import COLORS, RESULTS_DIR, CATALOG_PATH
+from catalog import RunCatalog
+
+# Cabeçalhos do CSV para cada coluna da série temporal
+CSV_HEADERS = {
+    'step': 'Step',
+    'tumor': 'Tumor Cells',
+    'necrotic': 'Necrotic Cells',
+    'growth_rate': 'Growth Rate',
+    'radius': 'Radius',
+    'perimeter': 'Perimeter',
+    'gyration_radius': 'Radius of Gyration',
+    'necrotic_fraction': 'Necrotic Fraction',
+    'roughness': 'Roughness',
+    'fractal_dimension': 'Fractal Dimension',
+}
 
 class DataManager:
     """Classe para gerenciar salvamento e carregamento de dados."""
+
+    def __init__(self, results_dir=RESULTS_DIR, catalog_path=CATALOG_PATH):
+        self.results_dir = results_dir
+        self.catalog_path = catalog_path
     
     def save_results(self, simulation):
-        """Salva resultados da simulação."""
-        if not simulation.steps:
-            return
-        
-        # Garantir comprimentos iguais
-        min_len = min(len(simulation.steps), len(simulation.tumor_count), 
-                     len(simulation.necrotic_count), len(simulation.growth_rates))
-        
-        # Criar dataframe
-        df = pd.DataFrame({
-            'Step': simulation.steps[:min_len],
-            'Tumor Cells': simulation.tumor_count[:min_len],
-            'Necrotic Cells': simulation.necrotic_count[:min_len],
-            'Growth Rate': simulation.growth_rates[:min_len]
-        })
+        """Salva os resultados em uma pasta própria e registra no catálogo.
+
+        Retorna o id da execução no catálogo.
+        """
+        series = simulation.series
+        if not len(series):
+            return None
         
-        try:
-            # Salvar CSV
-            df.to_csv('tumor_growth_results.csv', index=False)
-            print("Dados salvos em tumor_growth_results.csv")
-            
-            # Salvar imagem final
-            self._save_final_image(simulation)
-            
-        except Exception as e:
-            print(f"Erro ao salvar dados: {e}")
+        # Criar dataframe (todas as colunas da série têm o mesmo comprimento)
+        df = self._to_dataframe(series)
+
+        with RunCatalog(self.catalog_path) as catalog:
+            # O id do catálogo é único, mesmo entre processos de uma varredura
+            run_id = catalog.add_run(simulation)
+            run_dir = os.path.join(self.results_dir, f"run_{run_id:06d}")
+            series_path = os.path.join(run_dir, 'series.npz')
+            csv_path = os.path.join(run_dir, 'tumor_growth_results.csv')
+            image_path = os.path.join(run_dir, 'final_tumor_state.png')
+
+            try:
+                # Sem exist_ok: uma colisão falha em vez de sobrescrever
+                os.makedirs(run_dir)
+
+                # Salvar série colunar e CSV
+                series.save(series_path)
+                df.to_csv(csv_path, index=False)
+                print(f"Dados salvos em {csv_path}")
+
+                # Salvar imagem final
+                self._save_final_image(simulation, image_path)
+
+                catalog.set_artifacts(run_id, series_path=series_path,
+                                      csv_path=csv_path, image_path=image_path)
+                print(f"Execução {run_id} registrada em {self.catalog_path}")
+                return run_id
+
+            except Exception as e:
+                catalog.delete_run(run_id)
+                print(f"Erro ao salvar dados: {e}")
+                return None
+
+    def _to_dataframe(self, series):
+        """Converte a série temporal no DataFrame do CSV."""
+        import pandas as pd
+
+        df = pd.DataFrame({CSV_HEADERS.get(name, name): values
+                           for name, values in series.as_dict().items()})
+        df['Step'] = df['Step'].astype(int)
+        return df
     
-    def _save_final_image(self, simulation):
+    def _save_final_image(self, simulation, filename='final_tumor_state.png'):
         """Salva imagem do estado final."""
+        import matplotlib.pyplot as plt
+        from matplotlib.colors import ListedColormap
+
         plt.figure(figsize=(8, 8))
         cmap = ListedColormap(COLORS)
         plt.imshow(simulation.tumor_grid.grid, cmap=cmap)
         plt.title(f'Estado Final do Tumor (r={simulation.r:.4f}, '
                  f'Tratamento={simulation.treatment_factor:.2f})')
         plt.colorbar(ticks=[0, 1, 2], label='Tipo Celular')
-        plt.savefig('final_tumor_state.png', dpi=300, bbox_inches='tight')
+        plt.savefig(filename, dpi=300, bbox_inches='tight')
         plt.close()
-        print("Imagem final salva em final_tumor_state.png")
+        print(f"Imagem final salva em {filename}")
     
-    def load_results(self, filename='tumor_growth_results.csv'):
-        """Carrega resultados salvos."""
-        try:
-            df = pd.read_csv(filename)
-            return df
-        except FileNotFoundError:
-            print(f"Arquivo {filename} não encontrado.")
-            return None
-        except Exception as e:
-            print(f"Erro ao carregar dados: {e}")
-            return None
\ No newline at end of file
+    def load_results(self, run=None):
+        """Carrega resultados salvos como DataFrame.
+
+        `run` pode ser o id de uma execução do catálogo ou o caminho de um
+        CSV; sem `run`, carrega a execução mais recente do catálogo.
+        """
+        if run is None:
+            runs = self.find_runs(order_by='-id', limit=1, series_path__ne=None)
+            if not runs:
+                print(f"Nenhuma execução registrada em {self.catalog_path}.")
+                return None
+            run = runs[0]
+        if isinstance(run, (str, os.PathLike)):
+            import pandas as pd
+
+            try:
+                return pd.read_csv(run)
+            except FileNotFoundError:
+                print(f"Arquivo {run} não encontrado.")
+                return None
+            except Exception as e:
+                print(f"Erro ao carregar dados: {e}")
+                return None
+
+        df = self.load_run(run)
+        if df is None:
+            print(f"Execução {run['id'] if isinstance(run, dict) else run} não encontrada.")
+        return df
+
+    def find_runs(self, **filters):
+        """Consulta o catálogo (ver RunCatalog.find)."""
+        with RunCatalog(self.catalog_path) as catalog:
+            return catalog.find(**filters)
+
+    def load_run(self, run):
+        """Carrega como DataFrame a série de uma execução do catálogo."""
+        with RunCatalog(self.catalog_path) as catalog:
+            series = catalog.load_series(run)
+        return self._to_dataframe(series) if series is not None else None
@@ -0,0 +1,185 @@
+"""Métricas morfológicas do tumor (raio, perímetro, rugosidade...).
+
+As métricas consideram a lesão, isto é, as células tumorais e necróticas.
+`MorphologyMetrics` as mantém incrementalmente a partir das células que
+mudaram em cada passo; `compute_morphology` faz a varredura completa do
+grid e serve de referência para conferir o cálculo incremental.
+"""
+import itertools
+
+import numpy as np
+
+from config import HEALTHY, TUMOR, NECROTIC, METRIC_BOX_SIZES
+
+# Vizinhança de von Neumann (usada para perímetro e borda)
+_NEIGHBORS_4 = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def _scan(grid):
+    """Varre o grid inteiro e devolve os acumuladores das métricas."""
+    lesion = grid != HEALTHY
+    padded = np.pad(lesion, 1)  # Fora do grid conta como tecido saudável
+
+    # Arestas entre lesão e não-lesão (inclui a borda do grid)
+    perimeter = (np.count_nonzero(padded[1:, :] != padded[:-1, :]) +
+                 np.count_nonzero(padded[:, 1:] != padded[:, :-1]))
+
+    # Pontos médios das arestas de borda, em coordenadas dobradas
+    # (o centro da célula x fica em 2x+1 e a face entre x e x+1 em 2x+2)
+    edge_y, edge_x = np.nonzero(padded[1:, :] != padded[:-1, :])
+    horizontal = zip((2 * edge_x - 1).tolist(), (2 * edge_y).tolist())
+    edge_y, edge_x = np.nonzero(padded[:, 1:] != padded[:, :-1])
+    vertical = zip((2 * edge_x).tolist(), (2 * edge_y - 1).tolist())
+
+    ys, xs = np.nonzero(lesion)
+    totals = {
+        'tumor': int(np.count_nonzero(grid == TUMOR)),
+        'necrotic': int(np.count_nonzero(grid == NECROTIC)),
+        'sum_x': float(xs.sum()),
+        'sum_y': float(ys.sum()),
+        'sum_sq': float((xs.astype(float)**2 + ys.astype(float)**2).sum()),
+        'perimeter': int(perimeter),
+    }
+    return totals, _box_counts(itertools.chain(horizontal, vertical))
+
+
+def _box_counts(edges):
+    """Conta arestas de borda por caixa, para cada tamanho de caixa."""
+    counts = {size: {} for size in METRIC_BOX_SIZES}
+    for mx, my in edges:
+        for size, boxes in counts.items():
+            key = (mx // (2 * size), my // (2 * size))
+            boxes[key] = boxes.get(key, 0) + 1
+    return counts
+
+
+def _summarize(totals, occupied_boxes):
+    """Converte os acumuladores nas métricas publicadas."""
+    area = totals['tumor'] + totals['necrotic']
+    if area == 0:
+        return {
+            'radius': 0.0,
+            'perimeter': 0.0,
+            'gyration_radius': 0.0,
+            'necrotic_fraction': np.nan,
+            'roughness': np.nan,
+            'fractal_dimension': np.nan,
+        }
+
+    # Raio do disco de mesma área
+    radius = np.sqrt(area / np.pi)
+
+    mean_x = totals['sum_x'] / area
+    mean_y = totals['sum_y'] / area
+    gyration = np.sqrt(max(totals['sum_sq'] / area - mean_x**2 - mean_y**2, 0.0))
+
+    # Dimensão fractal da borda por contagem de caixas: N(s) ~ s^(-D).
+    # Caixas comparáveis ao tamanho da lesão achatam a curva, então só
+    # entram as menores que metade do raio de giração. O resultado é
+    # limitado a [1, 2], o intervalo possível para uma curva fechada.
+    sizes = [s for s in METRIC_BOX_SIZES if s <= gyration / 2]
+    if len(sizes) > 1:
+        slope = np.polyfit(np.log(sizes), np.log([occupied_boxes[s] for s in sizes]), 1)[0]
+        fractal_dimension = float(np.clip(-slope, 1.0, 2.0))
+    else:
+        fractal_dimension = np.nan
+
+    return {
+        'radius': radius,
+        'perimeter': float(totals['perimeter']),
+        'gyration_radius': gyration,
+        'necrotic_fraction': totals['necrotic'] / area,
+        # Razão entre o perímetro e o de um disco digital de mesma área
+        # (≈ 8R em arestas da vizinhança de 4); ≈ 1 para uma frente lisa
+        'roughness': totals['perimeter'] / (8 * radius),
+        'fractal_dimension': fractal_dimension,
+    }
+
+
+def compute_morphology(grid):
+    """Calcula as métricas varrendo o grid inteiro (cálculo de referência)."""
+    totals, boxes = _scan(grid)
+    return _summarize(totals, {size: len(b) for size, b in boxes.items()})
+
+
+class MorphologyMetrics:
+    """Métricas morfológicas atualizadas incrementalmente sobre um TumorGrid."""
+
+    def __init__(self, tumor_grid):
+        self.tumor_grid = tumor_grid
+        self.totals = {}
+        self.boxes = {}
+
+    def rebuild(self):
+        """Recalcula todos os acumuladores com uma varredura completa."""
+        self.totals, self.boxes = _scan(self.tumor_grid.grid)
+
+    def check(self):
+        """Confere as métricas incrementais com a varredura completa.
+
+        Lança AssertionError indicando as métricas que divergem.
+        """
+        current = self.values()
+        reference = compute_morphology(self.tumor_grid.grid)
+        wrong = {name: (current[name], reference[name]) for name in reference
+                 if not np.isclose(current[name], reference[name], equal_nan=True)}
+        if wrong:
+            raise AssertionError(f"Métricas incrementais divergem da referência: {wrong}")
+
+    def _in_grid(self, x, y):
+        return 0 <= x < self.tumor_grid.width and 0 <= y < self.tumor_grid.height
+
+    def _is_lesion(self, x, y):
+        return self._in_grid(x, y) and bool(self.tumor_grid.state_at(x, y) != HEALTHY)
+
+    def _count_edge(self, mx, my, delta):
+        """Soma `delta` às caixas que contêm a aresta de ponto médio (mx, my)."""
+        for size, boxes in self.boxes.items():
+            key = (mx // (2 * size), my // (2 * size))
+            count = boxes.get(key, 0) + delta
+            if count:
+                boxes[key] = count
+            else:
+                del boxes[key]
+
+    def update(self, changes):
+        """Atualiza as métricas a partir das células alteradas no passo.
+
+        `changes` é uma sequência de (x, y, estado_antigo, estado_novo); o
+        grid do `tumor_grid` já deve conter os estados novos.
+        """
+        totals = self.totals
+        flipped = set()
+        for x, y, old, new in changes:
+            for state, delta in ((old, -1), (new, 1)):
+                if state == TUMOR:
+                    totals['tumor'] += delta
+                elif state == NECROTIC:
+                    totals['necrotic'] += delta
+            if (old != HEALTHY) != (new != HEALTHY):
+                flipped.add((x, y))
+
+        for x, y in flipped:
+            is_lesion = self._is_lesion(x, y)
+            sign = 1 if is_lesion else -1
+            totals['sum_x'] += sign * x
+            totals['sum_y'] += sign * y
+            totals['sum_sq'] += sign * (x * x + y * y)
+
+            # Cada aresta é contada uma vez, mesmo entre duas células alteradas
+            for dx, dy in _NEIGHBORS_4:
+                nx, ny = x + dx, y + dy
+                neighbor_flipped = (nx, ny) in flipped
+                if neighbor_flipped and (nx, ny) < (x, y):
+                    continue
+                neighbor_lesion = self._is_lesion(nx, ny)
+                old_neighbor = neighbor_lesion != neighbor_flipped
+                delta = (int(is_lesion != neighbor_lesion) -
+                         int((not is_lesion) != old_neighbor))
+                if delta:
+                    totals['perimeter'] += delta
+                    self._count_edge(x + nx + 1, y + ny + 1, delta)
+
+    def values(self):
+        """Métricas atuais, no formato das colunas da série temporal."""
+        return _summarize(self.totals, {size: len(b) for size, b in self.boxes.items()})
@@ -1,44 +1,166 @@
 """Modelos e lógica de simulação tumoral."""
 import numpy as np
-from fontTools.merge.util import current_time
 
 from config import *
+from blockgrid import BlockArray
+from metrics import MorphologyMetrics
+from timeseries import TimeSeries
 
 class TumorGrid:
-    """Classe para gerenciar o grid da simulação tumoral."""
-    
+    """Classe para gerenciar o grid da simulação tumoral.
+
+    O grid é multirresolução (ver blockgrid.BlockArray): blocos uniformes
+    longe do tumor, ou já totalmente necróticos, ficam como um único valor
+    e são pulados pelo passo da simulação; os blocos são refinados quando
+    a frente tumoral se aproxima.
+    """
+
     def __init__(self):
-        self.grid = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=int)
-        self.ages = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=int)
+        self.width, self.height = GRID_WIDTH, GRID_HEIGHT
+        self.cells = BlockArray(GRID_HEIGHT, GRID_WIDTH, BLOCK_SIZE, HEALTHY)
+        self.ages = BlockArray(GRID_HEIGHT, GRID_WIDTH, BLOCK_SIZE, 0)
+        self.block_tumor = np.zeros(self.cells.block_shape, dtype=int)  # Células tumorais por bloco
         self.initial_tumor_count = 0
         self.scale_factor = 1
         self.real_world_scale = N0 #Fator de escala para o mundo real
-        
+        self.metrics = MorphologyMetrics(self)
+
     def initialize(self):
         """Inicializa o grid com tumor central."""
-        self.grid = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=int)
-        self.ages = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=int)
-        
+        self.cells = BlockArray(GRID_HEIGHT, GRID_WIDTH, BLOCK_SIZE, HEALTHY)
+        self.ages = BlockArray(GRID_HEIGHT, GRID_WIDTH, BLOCK_SIZE, 0)
+        self.block_tumor = np.zeros(self.cells.block_shape, dtype=int)
+
         center_x, center_y = GRID_WIDTH // 2, GRID_HEIGHT // 2
         self.initial_tumor_count = 0
-        
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
+
+        # Só a vizinhança do centro pode estar dentro do raio inicial
+        for y in range(max(0, center_y - INITIAL_RADIUS), min(GRID_HEIGHT, center_y + INITIAL_RADIUS + 1)):
+            for x in range(max(0, center_x - INITIAL_RADIUS), min(GRID_WIDTH, center_x + INITIAL_RADIUS + 1)):
                 dist = np.sqrt((x - center_x)**2 + (y - center_y)**2)
                 if dist <= INITIAL_RADIUS:
-                    self.grid[y, x] = TUMOR
+                    self.cells[y, x] = TUMOR
+                    self.block_tumor[y // BLOCK_SIZE, x // BLOCK_SIZE] += 1
                     self.initial_tumor_count += 1
-        
+
         # =================Calcular FATOR de escala=================
         self.scale_factor = N0 / self.initial_tumor_count if self.initial_tumor_count > 0 else 1
         print(f"Células tumorais iniciais: {self.initial_tumor_count} (≈ {self.scale_factor:.2e} células reais)")
+
+        self.metrics.rebuild()
         return self.initial_tumor_count
 
+    @property
+    def grid(self):
+        """Grid denso materializado (para visualização e gravação)."""
+        return self.cells.to_dense()
+
+    def state_at(self, x, y):
+        """Retorna o estado da célula (x, y)."""
+        return self.cells[y, x]
+
+    def count(self, state):
+        """Número exato de células no estado `state`."""
+        # Antes de initialize() as métricas estão vazias e o grid é todo saudável
+        tumor = self.metrics.totals.get('tumor', 0)
+        necrotic = self.metrics.totals.get('necrotic', 0)
+        if state == TUMOR:
+            return tumor
+        if state == NECROTIC:
+            return necrotic
+        if state == HEALTHY:
+            return self.width * self.height - tumor - necrotic
+        raise ValueError(f"Estado desconhecido: {state}")
+
+    def _near_tumor(self, key):
+        """Indica se o bloco ou algum bloco vizinho contém tumor."""
+        by, bx = key
+        return self.block_tumor[max(by - 1, 0):by + 2, max(bx - 1, 0):bx + 2].any()
+
+    def active_blocks(self):
+        """Blocos que o passo precisa varrer, já refinados.
+
+        Só células tumorais e células saudáveis vizinhas de tumor mudam de
+        estado, então basta varrer os blocos com tumor e seus vizinhos;
+        blocos uniformemente necróticos nunca mudam.
+        """
+        has_tumor = np.pad(self.block_tumor > 0, 1)
+        rows, cols = self.block_tumor.shape
+        near = np.zeros((rows, cols), dtype=bool)
+        for dy in range(3):
+            for dx in range(3):
+                near |= has_tumor[dy:dy + rows, dx:dx + cols]
+
+        keys = []
+        for by, bx in zip(*np.nonzero(near)):
+            key = (int(by), int(bx))
+            if not self.cells.is_refined(key):
+                if self.cells.uniform[key] == NECROTIC:
+                    continue
+                self.cells.refine(key)  # A frente tumoral chegou ao bloco
+            keys.append(key)
+        return keys
+
+    def iter_cells(self, keys):
+        """Percorre (x, y, estado) dos blocos `keys` em ordem de varredura.
+
+        A ordem é a mesma da varredura linha a linha do grid completo, só
+        que pulando os blocos fora de `keys`.
+        """
+        rows = {}
+        for by, bx in keys:
+            rows.setdefault(by, []).append(bx)
+
+        for by in sorted(rows):
+            spans = [(self.cells.blocks[(by, bx)], self.cells.bounds((by, bx)))
+                     for bx in sorted(rows[by])]
+            y_start, y_end = spans[0][1][:2]
+            for y in range(y_start, y_end):
+                for block, (y0, _, x0, x1) in spans:
+                    row = block[y - y0]
+                    for x in range(x0, x1):
+                        yield x, y, row[x - x0]
+
+    def apply(self, new_cells, keys):
+        """Troca as células pelas do passo e atualiza métricas e resolução.
+
+        Apenas os blocos em `keys` podem ter mudado.
+        """
+        changes = []
+        for key in keys:
+            before, after = self.cells.blocks[key], new_cells.blocks[key]
+            ys, xs = np.nonzero(before != after)
+            if not len(ys):
+                continue
+            self.block_tumor[key] += np.count_nonzero(after == TUMOR) - np.count_nonzero(before == TUMOR)
+            y0, _, x0, _ = self.cells.bounds(key)
+            changes.extend(zip((xs + x0).tolist(), (ys + y0).tolist(),
+                               before[ys, xs].tolist(), after[ys, xs].tolist()))
+
+        self.cells = new_cells
+        self.metrics.update(changes)
+        if METRICS_SELF_CHECK:
+            self.metrics.check()
+        self._coarsen(keys)
+
+    def _coarsen(self, keys):
+        """Volta a um único valor os blocos uniformes que ficaram quiescentes."""
+        for key in keys:
+            block = self.cells.blocks[key]
+            value = block.flat[0]
+            if value == TUMOR or not (block == value).all():
+                continue
+            if value == HEALTHY and self._near_tumor(key):
+                continue
+            # Idades só importam para células tumorais
+            self.cells.coarsen(key, value)
+            self.ages.coarsen(key, 0)
+
     '''FUNÇÃO NOVA TESTANDO'''
     def get_real_world_count(self):
         """Retorna a estimativa de células no mundo real."""
-        current_tumor = np.sum(self.grid == TUMOR)
-        current_necrotic = np.sum(self.grid == NECROTIC)
+        current_tumor = self.count(TUMOR)
+        current_necrotic = self.count(NECROTIC)
         return {
             'tumor_real': current_tumor * self.scale_factor,
             'necrotic_real': current_necrotic * self.scale_factor,
@@ -52,9 +174,9 @@ class TumorGrid:
         x_min, x_max = max(0, x-radius), min(GRID_WIDTH, x+radius+1)
         y_min, y_max = max(0, y-radius), min(GRID_HEIGHT, y+radius+1)
 
-        subgrid = self.grid[y_min:y_max, x_min:x_max]
         total_cells = (y_max - y_min) * (x_max - x_min)
-        tumor_cells = np.sum(subgrid == TUMOR) + np.sum(subgrid == NECROTIC)
+        tumor_cells = sum(self.cells[ny, nx] != HEALTHY
+                          for ny in range(y_min, y_max) for nx in range(x_min, x_max))
 
         return tumor_cells / total_cells# if total_cells > 0 else 0
 
@@ -66,7 +188,7 @@ class TumorGrid:
             for dy in [-1, 0, 1]:
                 nx, ny = x + dx, y + dy
                 if (0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT and
-                    self.grid[ny, nx] == HEALTHY):
+                    self.cells[ny, nx] == HEALTHY):
                     neighbors.append((nx, ny))
         return neighbors
 
@@ -77,23 +199,23 @@ class TumorGrid:
             for dy in [-1, 0, 1]:
                 nx, ny = x + dx, y + dy
                 if (0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT and
-                    self.grid[ny, nx] == TUMOR):
+                    self.cells[ny, nx] == TUMOR):
                     count += 1
         return count
 
 class TumorSimulation:
     """Classe principal para simulação do crescimento tumoral."""
 
-    def __init__(self):
+    def __init__(self, seed=None):
         self.tumor_grid = TumorGrid()
+        self.requested_seed = seed  # None -> nova semente a cada reset
         self.gamma = gamma
         self.r = r
         self.c0 = c0
         self.treatment_factor = 0
-        self.tumor_count = []
-        self.necrotic_count = []
-        self.steps = []
-        self.growth_rates = []
+        self.series = TimeSeries()
+        self.convergence_reason = None
+        self._seed_rng()
         self.tumor_grid.initialize()
         self.current_time = 0  # Rastreia o tempo na
         # garante maior precisão usando com exponencial
@@ -104,12 +226,35 @@ class TumorSimulation:
         self.r = r
         self.c0 = c0
         self.treatment_factor = 0
-        self.tumor_count = []
-        self.necrotic_count = []
-        self.steps = []
-        self.growth_rates = []
+        self.series.clear()
+        self.convergence_reason = None
+        self._seed_rng()
         self.current_time = 0
 
+    def _seed_rng(self):
+        """Cria o gerador aleatório da execução a partir da semente."""
+        self.seed = self.requested_seed
+        if self.seed is None:
+            self.seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self.rng = np.random.default_rng(self.seed)
+
+    # Visões (sem cópia) das colunas da série temporal
+    @property
+    def steps(self):
+        return self.series.column('step')
+
+    @property
+    def tumor_count(self):
+        return self.series.column('tumor')
+
+    @property
+    def necrotic_count(self):
+        return self.series.column('necrotic')
+
+    @property
+    def growth_rates(self):
+        return self.series.column('growth_rate')
+
     #New function
     def calculate_drug_concentration(self, t):
         time_in_days = t/24
@@ -127,22 +272,23 @@ class TumorSimulation:
         #DRUG EFFECT
         drug_effect = self.gamma * self.calculate_drug_concentration(self.current_time)
 
-        new_grid = self.tumor_grid.grid.copy()
+        # Só os blocos perto do tumor; os demais são quiescentes
+        active = self.tumor_grid.active_blocks()
+        new_grid = self.tumor_grid.cells.copy(active)
         #evita modificar o estado original enquanto processa células
 
         # Processar cada célula
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                if self.tumor_grid.grid[y, x] == TUMOR:
+        for x, y, state in self.tumor_grid.iter_cells(active):
+            if state == TUMOR:
 
-                    self._process_tumor_cell(x, y, new_grid, drug_effect)
+                self._process_tumor_cell(x, y, new_grid, drug_effect)
 
-                elif self.tumor_grid.grid[y, x] == HEALTHY:
+            elif state == HEALTHY:
 
-                    self._process_healthy_cell(x, y, new_grid)
+                self._process_healthy_cell(x, y, new_grid)
 
         # Atualizar grid
-        self.tumor_grid.grid = new_grid
+        self.tumor_grid.apply(new_grid, active)
 
         # Calcular estatísticas
         self._calculate_statistics(step)
@@ -168,7 +314,7 @@ class TumorSimulation:
             '''TESTE'''
             print(f"Processando célula com treatment_factor={self.treatment_factor}, drug_effect={drug_effect}")  # Debug
 
-            if np.random.random() < p_necrosis:
+            if self.rng.random() < p_necrosis:
                 new_grid[y, x] = NECROTIC
                 return
 
@@ -177,7 +323,7 @@ class TumorSimulation:
         if neighbors:
             tumor_density = self.tumor_grid.get_tumor_density(x, y)
 
-            global_density = np.sum(self.tumor_grid.grid == TUMOR) / (GRID_WIDTH * GRID_HEIGHT)
+            global_density = self.tumor_grid.count(TUMOR) / (GRID_WIDTH * GRID_HEIGHT)
             #global_density = max(global_density, 1e-10)
 
             #=====Taxa de crescimento baseada no modelo de Gompertz=====
@@ -188,8 +334,8 @@ class TumorSimulation:
             p_division = self.r * - np.log(global_density)- drug_effect
             #===========================================================
 
-            if np.random.random() < p_division:
-                nx, ny = neighbors[np.random.randint(0, len(neighbors))]
+            if self.rng.random() < p_division:
+                nx, ny = neighbors[self.rng.integers(len(neighbors))]
                 new_grid[ny, nx] = TUMOR
 
     def _process_healthy_cell(self, x, y, new_grid):
@@ -198,17 +344,26 @@ class TumorSimulation:
 
         # Transformação espontânea reduzida pelo tratamento
         if (tumor_neighbors > 0 and
-            np.random.random() < SPONTANEOUS_RATE * (1 - self.treatment_factor)):
+            self.rng.random() < SPONTANEOUS_RATE * (1 - self.treatment_factor)):
             new_grid[y, x] = TUMOR
 
     def _calculate_statistics(self, step):
         """Calcula estatísticas do passo atual."""
         real_counts = self.tumor_grid.get_real_world_count()
 
+        # Calcular taxa de crescimento
+        previous_tumor = self.series.last('tumor', default=0)
+        if previous_tumor > 0:
+            growth_rate = (real_counts['tumor_real'] - previous_tumor) / previous_tumor
+        else:
+            growth_rate = 0
+
         # Aplicar escala
-        self.tumor_count.append(real_counts['tumor_real'])
-        self.necrotic_count.append(real_counts['necrotic_real'])
-        self.steps.append(step)
+        self.series.append(step=step,
+                           tumor=real_counts['tumor_real'],
+                           necrotic=real_counts['necrotic_real'],
+                           growth_rate=growth_rate,
+                           **self.tumor_grid.metrics.values())
 
         #Log dos valores reais
         print(f"\nEstatísticas no passo {step}:")
@@ -216,13 +371,6 @@ class TumorSimulation:
         print(f"Células necróticas: {int(real_counts['necrotic_real']):,}")
         print(f"Total de células: {int(real_counts['total_real']):,}")
 
-        # Calcular taxa de crescimento
-        if len(self.tumor_count) > 1 and self.tumor_count[-2] > 0:
-            growth_rate = (self.tumor_count[-1] - self.tumor_count[-2]) / self.tumor_count[-2]
-            self.growth_rates.append(growth_rate)
-        else:
-            self.growth_rates.append(0)
-
     def is_stabilized(self, window_size=10, threshold=0.001):
         """Verifica se a simulação estabilizou."""
         if len(self.growth_rates) < window_size:
@@ -238,14 +386,17 @@ class TumorSimulation:
         """Verifica se a simulação convergiu (critérios de parada)."""
         # Se não há células tumorais, a simulação acabou
         if len(self.tumor_count) > 0 >= self.tumor_count[-1]:
-            return True, "Tumor eliminado"
+            self.convergence_reason = "Tumor eliminado"
+            return True, self.convergence_reason
 
         # Se estabilizou por um tempo
         if self.is_stabilized():
-            return True, "Simulação estabilizada"
+            self.convergence_reason = "Simulação estabilizada"
+            return True, self.convergence_reason
 
         # Se atingiu capacidade máxima
         if len(self.tumor_count) > 0 and self.tumor_count[-1] > K * 0.9:
-            return True, "Capacidade máxima atingida"
+            self.convergence_reason = "Capacidade máxima atingida"
+            return True, self.convergence_reason
 
         return False, "Continuando..."
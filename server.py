@@ -0,0 +1,467 @@
+"""Servidor local (asyncio) para submeter e acompanhar simulações.
+
+Rotas HTTP (somente localhost):
+    POST   /jobs               cria um job: {"r", "gamma", "c0", "treatment",
+                               "seed", "max_steps", "frame_every"}
+    GET    /jobs               lista os jobs
+    GET    /jobs/<id>          estado do job
+    GET    /jobs/<id>/events   Server-Sent Events com estatísticas e frames
+    GET    /jobs/<id>/result   resultado final (409 enquanto não terminar)
+    DELETE /jobs/<id>          cancela o job
+
+Para que páginas abertas no navegador não usem o serviço, só são aceitas
+requisições com Host local (127.0.0.1:PORTA ou localhost:PORTA) e sem
+Origin, e o POST exige Content-Type: application/json.
+
+Os jobs ficam em uma fila limitada e rodam em um pool de processos. Cada
+cliente de streaming tem seu próprio buffer: estatísticas antigas são
+descartadas quando o buffer enche e, dos frames, só o mais recente é
+mantido, de modo que clientes lentos nunca bloqueiam a simulação. Só os
+SERVER_MAX_FINISHED jobs terminados mais recentes ficam disponíveis.
+
+Uso: python server.py [--port PORTA] [--workers N]
+"""
+import argparse
+import asyncio
+import contextlib
+import ipaddress
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import signal
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.managers import SyncManager
+
+from config import (gamma, r, c0, MAX_STEPS, SERVER_HOST, SERVER_PORT,
+                    SERVER_WORKERS, SERVER_QUEUE_SIZE, SERVER_MAX_FINISHED,
+                    STREAM_FRAME_SIZE, STREAM_FRAME_EVERY, STREAM_STATS_BUFFER)
+
+MAX_BODY_SIZE = 64 * 1024
+MAX_HEADERS = 100
+TERMINAL_STATES = ('done', 'cancelled', 'error')
+
+_REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 403: 'Forbidden',
+            404: 'Not Found', 405: 'Method Not Allowed', 409: 'Conflict',
+            413: 'Payload Too Large', 415: 'Unsupported Media Type',
+            431: 'Request Header Fields Too Large',
+            500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+def _json_safe(value):
+    """NaN/inf não são JSON válido; viram null."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _ignore_sigint():
+    """Ctrl-C é tratado só pelo processo principal, que encerra os filhos."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def downsample_grid(cells, size=STREAM_FRAME_SIZE):
+    """Reduz o grid (BlockArray) para no máximo `size` células por lado.
+
+    A amostragem é feita direto nos blocos, sem materializar o grid denso.
+    """
+    stride = max(1, math.ceil(max(cells.height, cells.width) / size))
+    return cells.sample(stride)
+
+
+def run_job(params, events, cancel):
+    """Executa uma simulação em um processo do pool.
+
+    Envia ('stats', dict) a cada passo e ('frame', dict) a cada
+    `frame_every` passos pela fila `events`; verifica `cancel` entre passos.
+    """
+    # Importado aqui para que o processo principal não carregue o modelo
+    from models import TumorSimulation
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        simulation = TumorSimulation(seed=params['seed'])
+        simulation.r = params['r']
+        simulation.gamma = params['gamma']
+        simulation.c0 = params['c0']
+        simulation.treatment_factor = 1.0 if params['treatment'] else 0.0
+        series = simulation.series
+
+        cancelled = False
+        reason = "Limite de passos atingido"
+        for step in range(params['max_steps']):
+            if cancel.is_set():
+                cancelled, reason = True, "Cancelada"
+                break
+
+            simulation.update_step(step)
+            events.put(('stats', {name: _json_safe(float(series.last(name)))
+                                  for name in series.columns}))
+            if step % params['frame_every'] == 0:
+                frame = downsample_grid(simulation.tumor_grid.cells)
+                events.put(('frame', {'step': step, 'grid': frame.tolist()}))
+
+            converged, converged_reason = simulation.has_converged()
+            if converged:
+                reason = converged_reason
+                break
+
+    return {
+        'seed': simulation.seed,
+        'steps': len(series),
+        'cancelled': cancelled,
+        'convergence_reason': reason,
+        'series': {name: [_json_safe(v) for v in series.column(name).tolist()]
+                   for name in series.columns},
+    }
+
+
+def parse_job_params(body):
+    """Valida o corpo de POST /jobs; lança ValueError se for inválido."""
+    data = json.loads(body or b'{}')
+    if not isinstance(data, dict):
+        raise ValueError("o corpo deve ser um objeto JSON")
+
+    unknown = set(data) - {'r', 'gamma', 'c0', 'treatment', 'seed', 'max_steps', 'frame_every'}
+    if unknown:
+        raise ValueError(f"parâmetros desconhecidos: {sorted(unknown)}")
+
+    try:
+        params = {
+            'r': float(data.get('r', r)),
+            'gamma': float(data.get('gamma', gamma)),
+            'c0': float(data.get('c0', c0)),
+            'treatment': bool(data.get('treatment', False)),
+            'seed': None if data.get('seed') is None else int(data['seed']),
+            'max_steps': int(data.get('max_steps', MAX_STEPS)),
+            'frame_every': int(data.get('frame_every', STREAM_FRAME_EVERY)),
+        }
+    except OverflowError as e:  # int(1e400), por exemplo
+        raise ValueError(f"valor fora do intervalo: {e}") from e
+
+    for name in ('r', 'gamma', 'c0'):
+        if not math.isfinite(params[name]):
+            raise ValueError(f"{name} deve ser um número finito")
+    if params['seed'] is not None and params['seed'] < 0:
+        raise ValueError("seed deve ser >= 0")
+    if not 0 < params['max_steps'] <= MAX_STEPS * 5:
+        raise ValueError(f"max_steps deve estar entre 1 e {MAX_STEPS * 5}")
+    if params['frame_every'] < 1:
+        raise ValueError("frame_every deve ser >= 1")
+    return params
+
+
+class Subscriber:
+    """Buffer de um cliente de streaming, que descarta em vez de bloquear."""
+
+    def __init__(self):
+        self.stats = deque(maxlen=STREAM_STATS_BUFFER)
+        self.frame = None  # Só o frame mais recente
+        self.final = None
+        self.ready = asyncio.Event()
+
+    def offer(self, kind, payload):
+        if kind == 'stats':
+            self.stats.append(payload)
+        elif kind == 'frame':
+            self.frame = payload
+        else:
+            self.final = (kind, payload)
+        self.ready.set()
+
+    def take(self):
+        """Retorna os eventos pendentes, na ordem de envio."""
+        self.ready.clear()
+        events = [('stats', stats) for stats in self.stats]
+        self.stats.clear()
+        if self.frame is not None:
+            events.append(('frame', self.frame))
+            self.frame = None
+        if self.final is not None:
+            events.append(self.final)
+        return events
+
+
+class Job:
+    """Estado de um job no servidor."""
+
+    def __init__(self, job_id, params, manager):
+        self.id = job_id
+        self.params = params
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.last_stats = None
+        self.events = manager.Queue()
+        self.cancel_event = manager.Event()
+        self.subscribers = set()
+
+    def summary(self):
+        return {'id': self.id, 'status': self.status, 'params': self.params,
+                'last_stats': self.last_stats, 'error': self.error}
+
+    def publish(self, kind, payload):
+        if kind == 'stats':
+            self.last_stats = payload
+        for subscriber in self.subscribers:
+            subscriber.offer(kind, payload)
+
+
+class JobServer:
+    """Servidor HTTP local que enfileira simulações em um pool de processos."""
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT,
+                 workers=SERVER_WORKERS, queue_size=SERVER_QUEUE_SIZE):
+        if host != 'localhost' and not ipaddress.ip_address(host).is_loopback:
+            raise ValueError(f"O servidor só aceita endereços locais, não {host}")
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.queue_size = queue_size
+        self.jobs = {}
+        self.pending = deque()   # Jobs aguardando um processo
+        self.finished = deque()  # Ids dos jobs terminados, do mais antigo
+        self._ids = itertools.count(1)
+        self.allowed_hosts = set()
+
+    async def serve(self):
+        """Inicia o servidor e atende até ser interrompido."""
+        # Abre a porta antes de criar processos, para que uma porta ocupada
+        # encerre o programa sem deixar o pool e o gerenciador rodando
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Só aceita o cabeçalho Host local, contra DNS rebinding
+        port = server.sockets[0].getsockname()[1]
+        host = f'[{self.host}]' if ':' in self.host else self.host
+        self.allowed_hosts = {f'127.0.0.1:{port}', f'localhost:{port}', f'{host}:{port}'}
+
+        # spawn: processos limpos, que importam só o núcleo NumPy do modelo
+        context = multiprocessing.get_context('spawn')
+        self.manager = SyncManager(ctx=context)
+        self.manager.start(_ignore_sigint)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                        initializer=_ignore_sigint)
+        self._pending_changed = asyncio.Condition()
+        dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+        print(f"Servidor de simulações em http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            # Os jobs em andamento param no próximo passo; só então o pool
+            # e o gerenciador das filas podem ser encerrados
+            for job in self.jobs.values():
+                if job.status == 'running':
+                    job.cancel_event.set()
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            # Os dispatchers ainda usam as filas do gerenciador ao encerrar
+            for task in dispatchers:
+                task.cancel()
+            await asyncio.gather(*dispatchers, return_exceptions=True)
+            self.manager.shutdown()
+
+    # ---------------------------------------------------------------- jobs
+    async def _dispatch(self):
+        """Retira jobs da fila e os executa, um por vez, no pool."""
+        loop = asyncio.get_running_loop()
+        while True:
+            async with self._pending_changed:
+                await self._pending_changed.wait_for(lambda: self.pending)
+                job = self.pending.popleft()
+
+            job.status = 'running'
+            pump = asyncio.create_task(self._pump(job))
+            try:
+                job.result = await loop.run_in_executor(
+                    self.pool, run_job, job.params, job.events, job.cancel_event)
+                job.status = 'cancelled' if job.result['cancelled'] else 'done'
+            except Exception as e:
+                job.status, job.error = 'error', repr(e)
+            finally:
+                job.events.put(None)  # Encerra o pump
+                await pump
+            self._finish(job)
+
+    async def _pump(self, job):
+        """Repassa os eventos do processo trabalhador aos clientes."""
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await loop.run_in_executor(None, job.events.get)
+            if event is None:
+                return
+            job.publish(*event)
+
+    async def _submit(self, params):
+        if len(self.pending) >= self.queue_size:
+            raise asyncio.QueueFull
+        job = Job(str(next(self._ids)), params, self.manager)
+        self.jobs[job.id] = job
+        async with self._pending_changed:
+            self.pending.append(job)
+            self._pending_changed.notify()
+        return job
+
+    def _cancel(self, job):
+        if job.status == 'queued':
+            self.pending.remove(job)  # Libera a vaga na fila
+            job.status = 'cancelled'
+            self._finish(job)
+        elif job.status == 'running':
+            job.cancel_event.set()
+
+    def _finish(self, job):
+        """Avisa os clientes e descarta os jobs terminados mais antigos."""
+        job.publish('end', job.summary())
+        self.finished.append(job.id)
+        while len(self.finished) > SERVER_MAX_FINISHED:
+            self.jobs.pop(self.finished.popleft(), None)
+
+    # ---------------------------------------------------------------- HTTP
+    async def _handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            if len(request_line) != 3:
+                return
+            method, path, _ = request_line
+
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                if len(headers) >= MAX_HEADERS:
+                    await self._respond(writer, 431, {'error': 'cabeçalhos demais'})
+                    return
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            # Navegadores mandam Origin em requisições de outras páginas; o
+            # Host fora da lista indica acesso por outro nome (DNS rebinding)
+            if headers.get('host', '').lower() not in self.allowed_hosts:
+                await self._respond(writer, 403, {'error': 'Host não permitido'})
+                return
+            if 'origin' in headers:
+                await self._respond(writer, 403,
+                                    {'error': 'requisições de navegador não são aceitas'})
+                return
+            content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+            if method == 'POST' and content_type != 'application/json':
+                await self._respond(writer, 415, {'error': 'use Content-Type: application/json'})
+                return
+
+            try:
+                length = int(headers.get('content-length', 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                await self._respond(writer, 400, {'error': 'Content-Length inválido'})
+                return
+            if length > MAX_BODY_SIZE:
+                await self._respond(writer, 413, {'error': 'corpo muito grande'})
+                return
+            body = await reader.readexactly(length) if length else b''
+
+            await self._route(method, path.split('?')[0].rstrip('/'), body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            with contextlib.suppress(ConnectionError):
+                writer.close()
+                await writer.wait_closed()
+
+    async def _route(self, method, path, body, writer):
+        parts = path.strip('/').split('/')
+        if parts[0] != 'jobs':
+            await self._respond(writer, 404, {'error': 'rota inexistente'})
+            return
+
+        if len(parts) == 1:
+            if method == 'GET':
+                await self._respond(writer, 200, [job.summary() for job in self.jobs.values()])
+            elif method == 'POST':
+                try:
+                    job = await self._submit(parse_job_params(body))
+                except (ValueError, TypeError) as e:
+                    await self._respond(writer, 400, {'error': str(e)})
+                except asyncio.QueueFull:
+                    await self._respond(writer, 503, {'error': 'fila de jobs cheia'})
+                else:
+                    await self._respond(writer, 201, job.summary())
+            else:
+                await self._respond(writer, 405, {'error': 'método não permitido'})
+            return
+
+        job = self.jobs.get(parts[1])
+        if job is None or len(parts) > 3:
+            await self._respond(writer, 404, {'error': 'job inexistente'})
+            return
+
+        action = parts[2] if len(parts) == 3 else None
+        if action is None and method == 'GET':
+            await self._respond(writer, 200, job.summary())
+        elif action is None and method == 'DELETE':
+            self._cancel(job)
+            await self._respond(writer, 200, job.summary())
+        elif action == 'result' and method == 'GET':
+            if job.status not in TERMINAL_STATES:
+                await self._respond(writer, 409, {'error': 'job ainda não terminou',
+                                                  'status': job.status})
+            else:
+                await self._respond(writer, 200, {**job.summary(), 'result': job.result})
+        elif action == 'events' and method == 'GET':
+            await self._stream(job, writer)
+        else:
+            await self._respond(writer, 405, {'error': 'método não permitido'})
+
+    async def _respond(self, writer, status, payload):
+        body = json.dumps(payload, allow_nan=False).encode()
+        writer.write((f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                      "Content-Type: application/json\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Connection: close\r\n\r\n").encode() + body)
+        await writer.drain()
+
+    async def _stream(self, job, writer):
+        """Envia os eventos do job como Server-Sent Events."""
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\n"
+                     b"Connection: close\r\n\r\n")
+
+        subscriber = Subscriber()
+        if job.last_stats is not None:
+            subscriber.offer('stats', job.last_stats)
+        if job.status in TERMINAL_STATES:
+            subscriber.offer('end', job.summary())
+        job.subscribers.add(subscriber)
+        try:
+            while True:
+                await subscriber.ready.wait()
+                for kind, payload in subscriber.take():
+                    data = json.dumps(payload, allow_nan=False)
+                    writer.write(f"event: {kind}\ndata: {data}\n\n".encode())
+                    if kind == 'end':
+                        await writer.drain()
+                        return
+                # Só este cliente espera pelo envio; o job continua publicando
+                await writer.drain()
+        finally:
+            job.subscribers.discard(subscriber)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS)
+    parser.add_argument('--queue-size', type=int, default=SERVER_QUEUE_SIZE)
+    args = parser.parse_args()
+
+    server = JobServer(args.host, args.port, args.workers, args.queue_size)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(server.serve())
+
+
+if __name__ == '__main__':
+    main()
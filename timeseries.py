@@ -0,0 +1,96 @@
+"""Armazenamento colunar pré-alocado para as séries temporais da simulação."""
+import numpy as np
+
+from config import SERIES_COLUMNS, MAX_STEPS
+
+
+class TimeSeries:
+    """Série temporal com colunas fixas guardadas em um único array NumPy.
+
+    Cada linha corresponde a um passo da simulação. As colunas compartilham
+    o mesmo buffer e por isso têm sempre o mesmo comprimento; a capacidade
+    dobra quando o buffer enche, de forma que o custo de `append` é O(1)
+    amortizado. `column` devolve visões (sem cópia) do trecho preenchido.
+    """
+
+    def __init__(self, columns=SERIES_COLUMNS, capacity=MAX_STEPS):
+        self.columns = tuple(columns)
+        self._index = {name: i for i, name in enumerate(self.columns)}
+        self._data = np.full((len(self.columns), max(int(capacity), 1)), np.nan)
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @property
+    def capacity(self):
+        return self._data.shape[1]
+
+    def _grow(self, min_capacity):
+        """Realoca o buffer (dobrando a capacidade) preservando os dados."""
+        new_capacity = max(self.capacity * 2, min_capacity)
+        data = np.full((len(self.columns), new_capacity), np.nan)
+        data[:, :self.length] = self._data[:, :self.length]
+        self._data = data
+
+    def append(self, **values):
+        """Adiciona uma linha. Colunas omitidas ficam como NaN."""
+        unknown = set(values) - set(self._index)
+        if unknown:
+            raise KeyError(f"Colunas desconhecidas: {sorted(unknown)}")
+
+        if self.length == self.capacity:
+            self._grow(self.length + 1)
+
+        row = self.length
+        self._data[:, row] = np.nan
+        for name, value in values.items():
+            self._data[self._index[name], row] = value
+        self.length += 1
+
+    def column(self, name):
+        """Visão (sem cópia) da coluna `name` com os passos já registrados."""
+        return self._data[self._index[name], :self.length]
+
+    def last(self, name, default=None):
+        """Último valor da coluna, ou `default` se a série estiver vazia."""
+        if self.length == 0:
+            return default
+        return self._data[self._index[name], self.length - 1]
+
+    def add_column(self, name):
+        """Acrescenta uma coluna nova; as linhas existentes ficam como NaN."""
+        if name in self._index:
+            return
+        self._index[name] = len(self.columns)
+        self.columns += (name,)
+        self._data = np.vstack([self._data, np.full((1, self.capacity), np.nan)])
+
+    def clear(self):
+        """Esvazia a série mantendo o buffer já alocado."""
+        self.length = 0
+
+    def as_dict(self):
+        """Dicionário coluna -> visão, pronto para DataFrame ou gravação."""
+        return {name: self.column(name) for name in self.columns}
+
+    def save(self, path):
+        """Grava as colunas em formato colunar (.npz)."""
+        np.savez(path, **self.as_dict())
+
+    @classmethod
+    def load(cls, path):
+        """Carrega uma série gravada por `save`."""
+        with np.load(path) as data:
+            columns = list(data.files)
+            series = cls(columns, capacity=len(data[columns[0]]) if columns else 1)
+            for name in columns:
+                series._data[series._index[name], :len(data[name])] = data[name]
+            series.length = len(data[columns[0]]) if columns else 0
+        return series
@@ -1,15 +1,10 @@
 """Interface gráfica e visualização da simulação."""
 import matplotlib.pyplot as plt
-from fontTools.ttLib.woff2 import bboxFormat
 from matplotlib.colors import ListedColormap
 import matplotlib.animation as animation
-from matplotlib.lines import lineStyles
 from matplotlib.widgets import Slider, Button
 import numpy as np
-#from mpl_toolkits.mplot3d.proj3d import transform
-from pandas import interval_range
 
-import config
 from models import TumorGrid
 from config import *
 from models import TumorSimulation
@@ -322,19 +317,20 @@ class TumorVisualizer:
 
         
         # Atualizar gráficos
-        if self.simulation.steps:
-            self.line_tumor.set_data(self.simulation.steps, self.simulation.tumor_count)
-            self.line_necrotic.set_data(self.simulation.steps, self.simulation.necrotic_count)
+        if len(self.simulation.series):
+            steps, tumor, necrotic = self._plot_points()
+            self.line_tumor.set_data(steps, tumor)
+            self.line_necrotic.set_data(steps, necrotic)
 
 
         # Ajustar limites dinamicamente
         self._adjust_plot_limits()
         
         # Atualizar textos de status
-        tumor_count = np.sum(self.simulation.tumor_grid.grid == TUMOR)
-        necrotic_count = np.sum(self.simulation.tumor_grid.grid == NECROTIC)
+        tumor_count = self.simulation.tumor_grid.count(TUMOR)
+        necrotic_count = self.simulation.tumor_grid.count(NECROTIC)
         # Calcular células totais (tumor + necrótico)
-        total_cells = (np.sum(self.simulation.tumor_grid.grid == TUMOR) + np.sum(self.simulation.tumor_grid.grid == NECROTIC))
+        total_cells = tumor_count + necrotic_count
 
         # Aplicar escala
         real_count = total_cells * self.simulation.tumor_grid.scale_factor
@@ -348,6 +344,8 @@ class TumorVisualizer:
         # Verificar convergência da simulação
         converged, reason = self.simulation.has_converged()
         if converged or frame >= MAX_STEPS * 5:  # Limite de segurança
+            if not converged:
+                reason = self.simulation.convergence_reason = "Limite de passos atingido"
             print(f"Simulação concluída: {reason}")
             self.is_running = False
             self.status_text.set_text(f"Simulação concluída: {reason}")
@@ -358,6 +356,22 @@ class TumorVisualizer:
 
         return [self.im, self.line_tumor, self.line_necrotic]
 
+    def _plot_points(self):
+        """Séries do gráfico dizimadas para no máximo MAX_PLOT_POINTS pontos.
+
+        set_data copia os dados, então o custo por frame fica limitado em vez
+        de crescer com a duração da simulação. O último passo é sempre incluído.
+        """
+        columns = (self.simulation.steps, self.simulation.tumor_count,
+                   self.simulation.necrotic_count)
+        length = len(columns[0])
+        stride = -(-length // MAX_PLOT_POINTS)
+        if stride == 1:
+            return columns
+        if (length - 1) % stride:
+            return tuple(np.append(values[::stride], values[-1]) for values in columns)
+        return tuple(values[::stride] for values in columns)
+
     '''FUNÇÃO NOVA'''
     def _update_log_ticks(self, y_min, y_max):
         """Atualiza os ticks do eixo Y para escala logarítmica."""
@@ -382,11 +396,11 @@ class TumorVisualizer:
 
     def _adjust_plot_limits(self):
         """Ajusta limites dos gráficos dinamicamente para escala logarítmica."""
-        if not self.simulation.steps or not self.simulation.tumor_count:
+        if not len(self.simulation.series):
             return
 
         # Ajuste do eixo X
-        max_step = max(self.simulation.steps)
+        max_step = self.simulation.steps[-1]
         x_limit = max(max_step + 20, MAX_STEPS)
         self.ax2.set_xlim(0, x_limit)
 
@@ -418,7 +432,7 @@ class TumorVisualizer:
             self.ani.event_source.stop()
         
         # Se houver dados para salvar
-        if self.simulation.steps:
+        if len(self.simulation.series):
             try:
                 from data_manager import DataManager
                 data_manager = DataManager()